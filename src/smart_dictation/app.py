@@ -1,16 +1,18 @@
 import asyncio
 import structlog
 
-from smart_dictation import clipboard, hotkeys
+from smart_dictation import clipboard, hotkeys, volume_control
+from smart_dictation.logs import configure_logging
 from smart_dictation.audio import (
     get_device_info,
     get_sound_devices,
     record_audio,
     get_default_device,
+    open_record_session,
 )
-from smart_dictation.config import WhisperImpl, cfg
-from smart_dictation.local_whisper import WhisperCppTranscriber, to_whisper_ndarray
-from smart_dictation.volume_control import get_music_app_volume, mute_music_app, restore_music_app_volume, is_music_playing
+from smart_dictation.config import WhisperImpl, cfg, set_process_priority
+from smart_dictation.local_whisper import WhisperCppTranscriber
+from smart_dictation.volume_control import check_and_mute, restore_music_app_volume
 
 log = structlog.get_logger(__name__)
 
@@ -25,61 +27,53 @@ match (cfg.whisper_impl):
         raise ValueError(f"Invalid whisper implementation: {cfg.whisper_impl}")
 
 
-async def dictate(key_released):
-    # Save original Music app volume if it's playing
-    original_volume = None
-    music_playing = await is_music_playing()
-
+async def mute_music():
+    """Mute the Music app if it's playing, returning the volume to restore."""
+    music_playing, original_volume = await check_and_mute()
     if music_playing:
-        original_volume = await get_music_app_volume()
-        await log.ainfo("Saving Music app volume: %s", original_volume)
-        await mute_music_app()
-        await log.ainfo("Muted Music app for recording")
-
-    try:
-        device_info = get_device_info(cfg.input_device_index)
-        await log.ainfo("Recording, device: %s", device_info["name"])
+        log.info("Muted Music app for recording, saved volume: %s", original_volume)
+    return original_volume
 
-        # Create a wrapper for the key_released event to restore volume when recording stops
-        volume_restored = False
 
-        # Define a function to handle the key release event
-        async def on_key_released():
-            nonlocal volume_restored
-            # Wait for the original key_released event
-            await key_released.wait()
+async def dictate(key_released):
+    # Mute the Music app concurrently, so talking to Music doesn't delay recording
+    mute_task = asyncio.create_task(mute_music())
+    volume_restored = False
+
+    async def restore_volume():
+        nonlocal volume_restored
+        original_volume = await mute_task
+        if original_volume is not None and not volume_restored:
+            volume_restored = True
+            log.info("Restoring Music app volume to: %s", original_volume)
+            await restore_music_app_volume(original_volume)
 
-            # Restore volume immediately after recording stops
-            if music_playing and original_volume is not None and not volume_restored:
-                await log.ainfo("Restoring Music app volume to: %s", original_volume)
-                await restore_music_app_volume(original_volume)
-                volume_restored = True
+    async def on_key_released():
+        # Restore volume immediately after recording stops
+        await key_released.wait()
+        await restore_volume()
 
-            # Signal that recording should stop
-            return True
+    try:
+        device_info = get_device_info(cfg.input_device_index)
+        log.info("Recording, device: %s", device_info["name"])
 
         # Start a task to handle key release and volume restoration
         restore_task = asyncio.create_task(on_key_released())
 
         # Record audio with the original key_released event
         wave = await record_audio(
-            key_released, convert=to_whisper_ndarray, device=cfg.input_device_index
+            key_released, convert=transcribe.to_whisper_ndarray, device=cfg.input_device_index
         )
 
-        # Wait for the restore task to complete if it hasn't already
-        if not restore_task.done():
-            await restore_task
-
-        # Continue with transcription and pasting
-        await log.ainfo("Transcribing ...")
-        text = await transcribe(wave)
-        await log.ainfo("Pasting: %s", text)
+        # Transcribe while the volume is being restored, they don't depend on each other.
+        # Shielded, so cancelling the transcription doesn't leave Music muted
+        log.info("Transcribing ...")
+        text, _ = await asyncio.gather(transcribe(wave), asyncio.shield(restore_task))
+        log.info("Pasting: %s", text)
         await clipboard.paste_text(text)
     finally:
         # Ensure volume is restored if it hasn't been already
-        if music_playing and original_volume is not None and not volume_restored:
-            await log.ainfo("Restoring Music app volume to: %s", original_volume)
-            await restore_music_app_volume(original_volume)
+        await restore_volume()
 
 
 def select_device_from_menu():
@@ -132,6 +126,10 @@ async def start_listening():
         device_info = get_device_info(cfg.input_device_index)
         print(f"Using device: {device_info['name']}")
 
+    # Open the input stream now, so recordings don't pay for device setup
+    open_record_session(cfg.input_device_index)
+    volume_control.preload()
+    log.debug("Model directory: %s", cfg.whisper_models_dir)
     transcribe.preload()
     await hotkeys.listen_for_hotkeys({cfg.hotkey: dictate})
 
@@ -145,6 +143,8 @@ def list_sound_devices():
 
 
 def main():
+    configure_logging()
+    set_process_priority()
     asyncio.run(start_listening())
 
 
@@ -1,7 +1,8 @@
 import asyncio
-import io
-import wave
+import atexit
+import functools
 
+import numpy as np
 import pyaudio
 import structlog
 
@@ -11,18 +12,37 @@ log = structlog.get_logger(__name__)
 
 SAMPLE_RATE = 16000
 SAMPLE_WIDTH = 2
+MIN_RECORDING_SECONDS = 1.0
+INT16_SCALE = np.float32(1.0 / np.iinfo(np.int16).max)
 
+_pa = None
+_session = None
 
-def to_wave(samples, *, sample_rate, channels, sample_width):
-    buffer = io.BytesIO()
-    wf = wave.open(buffer, "wb")
-    wf.setnchannels(channels)
-    wf.setsampwidth(sample_width)
-    wf.setframerate(sample_rate)
-    wf.writeframes(samples)
-    wf.close()
-    buffer.seek(0)
-    return buffer
+
+def _get_pa() -> pyaudio.PyAudio:
+    """Return the shared PortAudio host, initializing it on first use."""
+    global _pa
+    if _pa is None:
+        _pa = pyaudio.PyAudio()
+    return _pa
+
+
+@atexit.register
+def _terminate_pa():
+    global _pa
+    _close_record_session()
+    if _pa is not None:
+        _pa.terminate()
+        _pa = None
+
+
+def to_whisper_ndarray(frames, *, sample_rate, channels, sample_width, out=None):
+    assert (sample_rate, channels, sample_width) == (16000, 1, 2), "16kHz 16bit mono"
+    samples = np.frombuffer(frames, dtype=np.int16)
+    # cast and scale in a single pass, without a float32 temporary
+    if out is None:
+        out = np.empty(samples.size, dtype=np.float32)
+    return np.multiply(samples, INT16_SCALE, out=out, casting="unsafe")
 
 
 def infer_time(samples, *, sample_rate=SAMPLE_RATE, sample_width=SAMPLE_WIDTH):
@@ -31,14 +51,83 @@ def infer_time(samples, *, sample_rate=SAMPLE_RATE, sample_width=SAMPLE_WIDTH):
 
 def get_default_device() -> tuple[int, str]:
     """Retrieve the default input sound device index."""
-    p = pyaudio.PyAudio()
-    try:
-        val = p.get_default_input_device_info()
-        return int(val["index"]), str(val["name"])
-    finally:
-        p.terminate()
-    # This line should never be reached, but just in case
-    return None, "default"
+    val = _get_pa().get_default_input_device_info()
+    return int(val["index"]), str(val["name"])
+
+
+class _RecordSession:
+    """Input stream kept open between recordings, only started while recording."""
+
+    def __init__(self, *, device, channels, sample_rate, format, frames_per_buffer=1024):
+        self.key = (device, channels, sample_rate, format)
+        self._sink = None
+        self.stream = _get_pa().open(
+            format=format,
+            channels=channels,
+            rate=sample_rate,
+            frames_per_buffer=frames_per_buffer,
+            input=True,
+            input_device_index=device,
+            stream_callback=self._on_audio,
+            start=False,
+        )
+
+    def _on_audio(self, in_data, frame_count, time_info, status):
+        # Runs on the PortAudio thread
+        sink = self._sink
+        if sink is not None:
+            sink(in_data)
+        return None, pyaudio.paContinue
+
+    def start(self, sink):
+        self._sink = sink
+        self.stream.start_stream()
+
+    def stop(self):
+        self.stream.stop_stream()
+        self._sink = None
+
+    def close(self):
+        self.stream.close()
+
+
+def open_record_session(
+    device=None, channels=1, sample_rate=SAMPLE_RATE, format=pyaudio.paInt16
+) -> _RecordSession:
+    """Return the shared input stream for these settings, opening it if needed."""
+    global _session
+    if _session is not None and _session.key != (device, channels, sample_rate, format):
+        _close_record_session()
+    if _session is None:
+        _session = _RecordSession(
+            device=device, channels=channels, sample_rate=sample_rate, format=format
+        )
+    return _session
+
+
+def _close_record_session():
+    global _session
+    if _session is not None:
+        _session.close()
+        _session = None
+
+
+async def _start_record_session(sink, device, channels, sample_rate, format):
+    """Start the shared input stream, reopening it once if the device went away."""
+    for _ in range(2):
+        try:
+            # Opening the device on first use can take a while, don't block the loop
+            session = await asyncio.to_thread(
+                open_record_session, device, channels, sample_rate, format
+            )
+            session.start(sink)
+            return session
+        except OSError as e:
+            # The stream may belong to a device that is gone, open a fresh one
+            _close_record_session()
+            error = e
+    log.error("Input device unavailable: %s", error)
+    raise hotkeys.StopTask("Input device unavailable") from error
 
 
 async def record_audio(
@@ -46,53 +135,49 @@ async def record_audio(
     channels=1,
     sample_rate=SAMPLE_RATE,
     format=pyaudio.paInt16,
-    convert=to_wave,
+    convert=to_whisper_ndarray,
     device=None,
 ):
-    frames_per_buffer = 1024
-    p = pyaudio.PyAudio()
-    stream = p.open(
-        format=format,
-        channels=channels,
-        rate=sample_rate,
-        frames_per_buffer=frames_per_buffer,
-        input=True,
-        input_device_index=device,
+    samples = bytearray()
+    loop = asyncio.get_running_loop()
+
+    # Chunks arrive on the PortAudio thread, hand them over to the event loop
+    session = await _start_record_session(
+        functools.partial(loop.call_soon_threadsafe, samples.extend),
+        device, channels, sample_rate, format,
     )
     try:
-        frames = []
         log.info("Recording started, waiting for stop event")
 
         # Check if the stop event is already set (shouldn't be, but just in case)
         if stop_event.is_set():
             log.warning("Stop event was already set at recording start")
 
-        # Record until the stop event is set
-        while not stop_event.is_set():
-            data = stream.read(frames_per_buffer)
-            frames.append(data)
-            await asyncio.sleep(0.0)
-
+        # Record until the stop event is set, the loop stays free meanwhile
+        await stop_event.wait()
         log.info("Stop event received, stopping recording")
-        samples = b"".join(frames)
-        if infer_time(samples) > 1.0:
-            return convert(
-                b"".join(frames),
-                sample_rate=sample_rate,
-                channels=channels,
-                sample_width=p.get_sample_size(format),
-            )
-        else:
-            raise hotkeys.StopTask("Too short audio")
     finally:
-        stream.stop_stream()
-        stream.close()
-        p.terminate()
+        session.stop()
+
+    # Let chunks delivered before the stream stopped land in the buffer
+    await asyncio.sleep(0)
+    # Decide on the byte count alone, accidental taps never touch the samples
+    sample_width = _get_pa().get_sample_size(format)
+    duration = infer_time(samples, sample_rate=sample_rate, sample_width=sample_width)
+    if duration / channels <= MIN_RECORDING_SECONDS:
+        raise hotkeys.StopTask("Too short audio")
+    return convert(
+        samples,
+        sample_rate=sample_rate,
+        channels=channels,
+        sample_width=sample_width,
+    )
 
 
+@functools.lru_cache(maxsize=None)
 def get_sound_devices() -> list:
-    """Retrieve a list of input sound devices."""
-    p = pyaudio.PyAudio()
+    """Retrieve a list of input sound devices, cached for the session."""
+    p = _get_pa()
     devices = []
     info = p.get_host_api_info_by_index(0)
     numdevices = int(info.get("deviceCount", 0))
@@ -100,12 +185,11 @@ def get_sound_devices() -> list:
         device_info = p.get_device_info_by_host_api_device_index(0, i)
         if int(device_info.get("maxInputChannels", 0)) > 0:
             devices.append((device_info.get("index"), device_info.get("name")))
-    p.terminate()
     return devices
 
 
+@functools.lru_cache(maxsize=None)
 def get_device_info(device_index):
     if device_index is None:
         return {"name": "default"}
-    p = pyaudio.PyAudio()
-    return p.get_device_info_by_host_api_device_index(0, device_index)
+    return _get_pa().get_device_info_by_host_api_device_index(0, device_index)
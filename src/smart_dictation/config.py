@@ -1,16 +1,53 @@
+import ctypes
 import enum
+import functools
 import os
 import platform
 from pathlib import Path
+from typing import Literal
 
 import pywhispercpp.constants
 import pywhispercpp.model
+import structlog
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+log = structlog.get_logger(__name__)
+
 # from pywhispercpp.constants import MODELS_DIR
 MODEL_DIR = pywhispercpp.constants.MODELS_DIR
-print(MODEL_DIR)
+
+
+# Threads for whisper.cpp where the core layout is not queried
+DEFAULT_N_THREADS = 6
+
+# QoS class from <sys/qos.h>, keeps threads on performance cores on Apple Silicon
+QOS_CLASS_USER_INTERACTIVE = 0x21
+
+
+@functools.lru_cache(maxsize=None)
+def _libsystem():
+    return ctypes.CDLL("/usr/lib/libSystem.dylib")
+
+
+def _sysctl_int(name: str) -> int | None:
+    """Read an integer sysctl value on macOS, None if it is not available."""
+    value = ctypes.c_int(0)
+    size = ctypes.c_size_t(ctypes.sizeof(value))
+    if _libsystem().sysctlbyname(name.encode(), ctypes.byref(value), ctypes.byref(size), None, 0):
+        return None
+    return value.value
+
+
+def default_n_threads() -> int:
+    """Number of performance cores on Apple Silicon, physical cores on Intel Macs, 6 elsewhere."""
+    if platform.system() == "Darwin":
+        # whisper.cpp slows down once threads spill over to efficiency cores
+        for name in ("hw.perflevel0.physicalcpu", "hw.physicalcpu"):
+            if n_cores := _sysctl_int(name):
+                return n_cores
+    # os.cpu_count() includes SMT siblings, which would oversubscribe the cores
+    return DEFAULT_N_THREADS
 
 
 class WhisperImpl(enum.Enum):
@@ -21,11 +58,17 @@ class WhisperImpl(enum.Enum):
 
 class WhisperConfig(BaseSettings):
     whisper_model: str = Field(default="large-v3-turbo", alias="model")
+    # quantized weights are smaller and faster on CPU, f16 loads the unquantized model
+    whisper_quantization: Literal["f16", "q8_0", "q5_1", "q5_0"] = Field(
+        default="q8_0", alias="quantization"
+    )
     whisper_impl: WhisperImpl = Field(default=WhisperImpl.cpp, alias="implementation")
     whisper_models_dir: Path = Field(default=Path(MODEL_DIR), alias="models_dir")
-    n_threads: int = Field(default=6, alias="threads")
+    n_threads: int = Field(default_factory=default_n_threads, alias="threads")
     hotkey: str = Field(default="<ctrl>")
     input_device_index: int | None = Field(default=None)
+    # run a dummy transcription on startup so the first real one is not cold
+    warmup: bool = Field(default=True)
 
     model_config = SettingsConfigDict(
         env_prefix="smart_dictation_", cli_parse_args=True
@@ -36,17 +79,26 @@ cfg = WhisperConfig()
 
 nice_level = -20
 
-# Always set high process priority
+def set_thread_qos():
+    """Raise the calling thread's QoS class, threads it starts inherit it."""
+    if platform.system() == "Darwin":
+        # The QoS class drives core selection on macOS, nice mostly affects I/O
+        if _libsystem().pthread_set_qos_class_self_np(QOS_CLASS_USER_INTERACTIVE, 0):
+            log.warning("Failed to set thread QoS class to user interactive")
+
+
+# Always set high process priority, called on app startup
 def set_process_priority():
+    set_thread_qos()
     try:
         if platform.system() == "Darwin":  # macOS
             # Lower values mean higher priority (-20 to 20)
             # -20 is a good balance between high priority and system stability
             os.nice(nice_level)
-            print(f"Process priority set to {nice_level} (high performance mode)")
+            log.debug("Process priority set to %s (high performance mode)", nice_level)
     except (OSError, AttributeError) as e:
-        print(f"Failed to set process priority: {e}")
-        print("You may need to run the app with sudo for higher priority.")
-
-# Call this function to set the priority when the module is imported
-set_process_priority()
+        log.warning(
+            "Failed to set process priority: %s. "
+            "You may need to run the app with sudo for higher priority.",
+            str(e),
+        )
@@ -16,6 +16,16 @@ class StopTask(RuntimeError):
     pass
 
 
+def parse_hotkey(hotkey: str) -> tuple:
+    """Parse a hotkey string into keys."""
+    return tuple(HotKey.parse(hotkey))
+
+
+# Canonical keys per hotkey string. canonical() can cost a round trip to the
+# platform per key, and its result doesn't change between listeners
+_canonical_hotkeys: dict[str, tuple] = {}
+
+
 class AsyncHotKey(HotKey):
     def __init__(
         self,
@@ -29,7 +39,8 @@ class AsyncHotKey(HotKey):
         self._pressed_event = asyncio.Event()
         self._pressed_event.clear()
         self._released_event.set()
-        self._loop = asyncio.get_event_loop()
+        # Key callbacks arrive on pynput's thread, keep the loop to hand them over
+        self._loop = asyncio.get_running_loop()
 
     def __on_activate(self):
         if not self._activated:
@@ -71,12 +82,18 @@ class AsyncGlobalHotKeys(GlobalHotKeys):
         **kwargs,
     ):
         super().__init__({}, *args, **kwargs)
-        self._loop = asyncio.get_event_loop()
         self._hotkeys = [
-            AsyncHotKey([self.canonical(key) for key in HotKey.parse(key)], value)
+            AsyncHotKey(self._canonical_keys(key), value)
             for key, value in hotkeys.items()
         ]
 
+    def _canonical_keys(self, hotkey: str) -> tuple:
+        keys = _canonical_hotkeys.get(hotkey)
+        if keys is None:
+            keys = tuple(self.canonical(key) for key in parse_hotkey(hotkey))
+            _canonical_hotkeys[hotkey] = keys
+        return keys
+
     async def run_forever(self):
         """Start the global hotkeys listener asynchronously."""
         with self:
@@ -92,7 +109,6 @@ class AsyncFnHotKey:
         self._pressed_event = asyncio.Event()
         self._pressed_event.clear()
         self._released_event.set()
-        self._loop = asyncio.get_event_loop()
 
     async def start(self):
         """Start listening for fn key events."""
@@ -0,0 +1,17 @@
+"""
+Conversions no longer used by the whisper.cpp pipeline, kept for API based backends.
+"""
+import io
+import wave
+
+
+def to_wave(samples, *, sample_rate, channels, sample_width):
+    buffer = io.BytesIO()
+    wf = wave.open(buffer, "wb")
+    wf.setnchannels(channels)
+    wf.setsampwidth(sample_width)
+    wf.setframerate(sample_rate)
+    wf.writeframes(samples)
+    wf.close()
+    buffer.seek(0)
+    return buffer
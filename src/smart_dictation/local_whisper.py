@@ -1,35 +1,175 @@
 import asyncio
+import atexit
+import multiprocessing
+from multiprocessing import shared_memory
+
 import numpy as np
+import pywhispercpp.constants
 import pywhispercpp.model
 import structlog
-from smart_dictation.config import cfg
-from functools import cached_property
+from smart_dictation import audio, hotkeys
+from smart_dictation.config import cfg, set_thread_qos
+
+log = structlog.get_logger(__name__)
+
+
+def quantized_model_name(model: str, quantization: str) -> str:
+    """Name of the quantized variant of `model`, if whisper.cpp publishes one."""
+    if quantization == "f16" or "-q" in model:
+        return model
+    name = f"{model}-{quantization}"
+    if name not in pywhispercpp.constants.AVAILABLE_MODELS:
+        log.warning("No %s variant of %s, using unquantized model", quantization, model)
+        return model
+    return name
+
+
+def warmup(model):
+    """Transcribe a second of silence to fault in weights and init kernels."""
+    try:
+        model.transcribe(np.zeros(16000, dtype=np.float32), language="en")
+    except Exception as e:
+        log.warning("Model warmup failed: %s", str(e))
+
+
+def _give_up(message):
+    """Drop this recording without stopping the hotkey loop, the worker restarts on next use."""
+    log.error(message)
+    return hotkeys.StopTask(message)
 
 
-def to_whisper_ndarray(frames, *, sample_rate, channels, sample_width):
-    assert (sample_rate, channels, sample_width) == (16000, 1, 2), "16kHz 16bit mono"
-    return (
-        np.frombuffer(frames, dtype=np.int16).astype(np.float32)
-        / np.iinfo(np.int16).max
-    )
+def _worker_main(conn, model_name, models_dir, n_threads, warm_up):
+    """Worker process: load the model once, then transcribe shared memory audio."""
+    set_thread_qos()
+    pywhispercpp.model.logging = structlog.get_logger()
+    model = pywhispercpp.model.Model(model_name, models_dir=models_dir, n_threads=n_threads)
+    if warm_up:
+        warmup(model)
+    conn.send("ready")
+
+    shm = None
+    while True:
+        try:
+            shm_name, n_samples = conn.recv()
+        except EOFError:
+            return
+        if shm is None or shm.name != shm_name:
+            # The parent grew its buffer into a new segment
+            if shm is not None:
+                shm.close()
+            shm = shared_memory.SharedMemory(name=shm_name)
+        try:
+            segments = model.transcribe(
+                np.frombuffer(shm.buf, dtype=np.float32, count=n_samples),
+                language=None,
+            )
+            reply = (" ".join([segment.text for segment in segments]), None)
+        except Exception as e:
+            reply = (None, str(e))
+        conn.send(reply)
 
 
 class WhisperCppTranscriber:
+    """Runs whisper.cpp in a worker process, so transcription never stalls the app."""
+
     def __init__(self):
-        pywhispercpp.model.logging = structlog.get_logger()
-
-    @cached_property
-    def model(self):
-        return pywhispercpp.model.Model(
-            cfg.whisper_model,
-            models_dir=str(cfg.whisper_models_dir),
-            n_threads=cfg.n_threads,
+        # Shared memory segment holding the audio for the worker, and a float32
+        # view of all of it. Reused across recordings, transcriptions never overlap
+        self._shm = None
+        self._f32_buf = np.empty(0, dtype=np.float32)
+        # Segments that couldn't be closed yet, because a recording still uses them
+        self._retired = []
+        self._process = None
+        self._conn = None
+        atexit.register(self._release_buffer)
+
+    def _buffer(self, n_samples):
+        """A float32 view of the first `n_samples` of the shared buffer, grown if needed."""
+        if self._shm is None or self._f32_buf.size < n_samples:
+            self._release_buffer()
+            self._shm = shared_memory.SharedMemory(create=True, size=max(n_samples, 1) * 4)
+            # frombuffer holds the buffer export, so closing the segment fails
+            # with BufferError instead of unmapping memory that is still in use
+            self._f32_buf = np.frombuffer(self._shm.buf, dtype=np.float32)
+        return self._f32_buf[:n_samples]
+
+    def _release_buffer(self):
+        """Unlink the shared buffer, the worker drops its mapping on the next transcription."""
+        self._f32_buf = np.empty(0, dtype=np.float32)
+        if self._shm is not None:
+            self._shm.unlink()
+            self._retired.append(self._shm)
+            self._shm = None
+        for shm in list(self._retired):
+            try:
+                shm.close()
+            except BufferError:
+                continue
+            self._retired.remove(shm)
+
+    def to_whisper_ndarray(self, frames, *, sample_rate, channels, sample_width):
+        """Convert recorded frames straight into the buffer shared with the worker."""
+        return audio.to_whisper_ndarray(
+            frames,
+            sample_rate=sample_rate,
+            channels=channels,
+            sample_width=sample_width,
+            out=self._buffer(len(frames) // sample_width),
         )
 
     def preload(self):
-        self.model
+        """Start the worker process and wait until its model is loaded."""
+        if self._process is not None and self._process.is_alive():
+            return
+        # fork is unsafe once macOS frameworks are loaded, always spawn
+        ctx = multiprocessing.get_context("spawn")
+        self._conn, child_conn = ctx.Pipe()
+        self._process = ctx.Process(
+            target=_worker_main,
+            args=(
+                child_conn,
+                quantized_model_name(cfg.whisper_model, cfg.whisper_quantization),
+                str(cfg.whisper_models_dir),
+                cfg.n_threads,
+                cfg.warmup,
+            ),
+            daemon=True,
+        )
+        self._process.start()
+        child_conn.close()
+        try:
+            self._conn.recv()
+        except EOFError:
+            self.stop()
+            raise RuntimeError("Whisper worker process failed to load the model")
+
+    def stop(self):
+        """Kill the worker process, it is started again on next use."""
+        if self._process is not None:
+            self._process.kill()
+            self._process.join()
+            self._conn.close()
+            self._process = self._conn = None
 
     async def __call__(self, audio_data: np.ndarray):
-        segments = self.model.transcribe(audio_data, language=None)
-        await asyncio.sleep(0)
-        return " ".join([segment.text for segment in segments])
+        if self._process is None or not self._process.is_alive():
+            try:
+                await asyncio.to_thread(self.preload)
+            except RuntimeError as e:
+                raise _give_up(str(e)) from e
+        if not np.may_share_memory(audio_data, self._f32_buf):
+            # Not converted by to_whisper_ndarray, copy it into the shared buffer
+            self._buffer(audio_data.size)[:] = audio_data
+        try:
+            self._conn.send((self._shm.name, audio_data.size))
+            text, error = await asyncio.to_thread(self._conn.recv)
+        except asyncio.CancelledError:
+            # Don't wait for a transcription nobody needs, restart the worker instead
+            self.stop()
+            raise
+        except (EOFError, OSError) as e:
+            self.stop()
+            raise _give_up("Whisper worker process died") from e
+        if error is not None:
+            raise _give_up(f"Transcription failed: {error}")
+        return text
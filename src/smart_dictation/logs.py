@@ -0,0 +1,57 @@
+"""
+Logging setup that keeps log formatting and terminal writes off the event loop.
+"""
+import atexit
+import logging
+import logging.handlers
+import queue
+import sys
+
+import structlog
+
+
+class _RecordQueueHandler(logging.handlers.QueueHandler):
+    """Enqueue records as they are, the listener thread formats them."""
+
+    def prepare(self, record):
+        return record
+
+
+def configure_logging(level=logging.INFO):
+    """
+    Route structlog through stdlib logging and a queue drained by a background thread.
+
+    Logging calls only filter, timestamp and enqueue; formatting positional
+    arguments, rendering and writing to stderr happen on the listener thread.
+    """
+    structlog.configure(
+        processors=[
+            structlog.stdlib.filter_by_level,
+            structlog.stdlib.add_logger_name,
+            structlog.stdlib.add_log_level,
+            structlog.processors.TimeStamper(fmt="%Y-%m-%d %H:%M:%S", utc=False),
+            structlog.stdlib.ProcessorFormatter.wrap_for_formatter,
+        ],
+        logger_factory=structlog.stdlib.LoggerFactory(),
+        wrapper_class=structlog.stdlib.BoundLogger,
+        cache_logger_on_first_use=True,
+    )
+
+    handler = logging.StreamHandler(sys.stderr)
+    handler.setFormatter(
+        structlog.stdlib.ProcessorFormatter(
+            processors=[
+                structlog.stdlib.ProcessorFormatter.remove_processors_meta,
+                structlog.stdlib.PositionalArgumentsFormatter(),
+                structlog.dev.ConsoleRenderer(),
+            ],
+        )
+    )
+    log_queue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, handler)
+    listener.start()
+    atexit.register(listener.stop)
+
+    root = logging.getLogger()
+    root.addHandler(_RecordQueueHandler(log_queue))
+    root.setLevel(level)
@@ -5,7 +5,6 @@ This module uses PyObjC to directly interact with macOS APIs for reliable fn key
 import sys
 import asyncio
 import threading
-import time
 import structlog
 from typing import Callable, Optional
 
@@ -14,15 +13,40 @@ log = structlog.get_logger(__name__)
 if sys.platform == 'darwin':
     import objc
     from AppKit import NSEvent
-    from Quartz import CGEventSourceKeyState, kCGEventSourceStateHIDSystemState
+    from Quartz import (
+        CFAbsoluteTimeGetCurrent,
+        CFMachPortCreateRunLoopSource,
+        CFRunLoopAddSource,
+        CFRunLoopAddTimer,
+        CFRunLoopGetCurrent,
+        CFRunLoopRun,
+        CFRunLoopStop,
+        CFRunLoopTimerCreate,
+        CGEventGetFlags,
+        CGEventMaskBit,
+        CGEventSourceKeyState,
+        CGEventTapCreate,
+        CGEventTapEnable,
+        kCFRunLoopCommonModes,
+        kCGEventFlagMaskSecondaryFn,
+        kCGEventFlagsChanged,
+        kCGEventSourceStateHIDSystemState,
+        kCGEventTapDisabledByTimeout,
+        kCGEventTapDisabledByUserInput,
+        kCGEventTapOptionListenOnly,
+        kCGHeadInsertEventTap,
+        kCGSessionEventTap,
+    )
 
     # Function key constants
     FN_KEY_CODE = 63  # This is the virtual key code for the fn key on Mac
 
     class MacFnKeyHandler:
         """
-        Handler for Mac fn key detection using direct polling.
-        This class provides a way to detect fn key presses and releases on macOS.
+        Handler for Mac fn key detection using a Quartz event tap.
+        The fn key is a modifier, so its transitions arrive as flagsChanged events.
+        Without input monitoring permission the tap cannot be created and the
+        handler falls back to polling the key state from a run loop timer.
         """
         def __init__(self):
             self._fn_pressed = False
@@ -30,7 +54,9 @@ if sys.platform == 'darwin':
             self._loop = None
             self._running = False
             self._thread = None
-            self._poll_interval = 0.01  # 10ms polling interval
+            self._tap = None
+            self._run_loop = None
+            self._poll_interval = 0.05  # 50ms fallback polling interval
 
         def is_fn_pressed(self) -> bool:
             """Returns whether the fn key is currently pressed."""
@@ -44,7 +70,7 @@ if sys.platform == 'darwin':
 
         def start(self, callback: Callable[[bool], None], loop: asyncio.AbstractEventLoop) -> None:
             """
-            Start monitoring fn key events by polling.
+            Start monitoring fn key events.
             
             Args:
                 callback: Function to call when fn key state changes. Takes a boolean indicating if pressed.
@@ -57,11 +83,11 @@ if sys.platform == 'darwin':
             self._loop = loop
             self._running = True
             
-            # Start polling in a separate thread
-            self._thread = threading.Thread(target=self._polling_thread, daemon=True)
+            # Run the event tap on its own CFRunLoop in a separate thread
+            self._thread = threading.Thread(target=self._event_tap_thread, daemon=True)
             self._thread.start()
             
-            log.info("Mac fn key handler started (polling mode)")
+            log.info("Mac fn key handler started")
 
         def stop(self) -> None:
             """Stop monitoring fn key events."""
@@ -69,36 +95,68 @@ if sys.platform == 'darwin':
                 return
                 
             self._running = False
+            if self._run_loop is not None:
+                CFRunLoopStop(self._run_loop)
             if self._thread and self._thread.is_alive():
                 self._thread.join(timeout=1.0)
                 
             log.info("Mac fn key handler stopped")
 
-        def _polling_thread(self) -> None:
-            """Thread that polls for fn key state changes."""
-            last_state = False
-            
-            try:
-                while self._running:
-                    # Check current state
-                    current_state = self.is_fn_pressed()
-                    
-                    # If state changed, notify callback
-                    if current_state != last_state:
-                        log.info("Fn key state changed: %s", current_state)
-                        last_state = current_state
-                        
-                        if self._callback and self._loop:
-                            self._loop.call_soon_threadsafe(self._callback, current_state)
-                    
-                    # Sleep for a short time
-                    time.sleep(self._poll_interval)
-            except Exception as e:
-                log.error("Error in fn key polling thread: %s", e)
-                if self._running and self._callback and self._loop:
-                    self._loop.call_soon_threadsafe(
-                        lambda: log.error("Fn key polling stopped due to error")
-                    )
+        def _set_state(self, pressed: bool) -> None:
+            """Notify the callback when the fn key state changes."""
+            if pressed == self._fn_pressed:
+                return
+            log.info("Fn key state changed: %s", pressed)
+            self._fn_pressed = pressed
+            if self._callback and self._loop:
+                self._loop.call_soon_threadsafe(self._callback, pressed)
+
+        def _on_event(self, proxy, event_type, event, refcon):
+            """Event tap callback, called on the run loop thread."""
+            if event_type in (kCGEventTapDisabledByTimeout, kCGEventTapDisabledByUserInput):
+                # The system disables taps it considers unresponsive, turn it back on
+                CGEventTapEnable(self._tap, True)
+            elif event_type == kCGEventFlagsChanged:
+                self._set_state(bool(CGEventGetFlags(event) & kCGEventFlagMaskSecondaryFn))
+            return event
+
+        def _on_poll_timer(self, timer, info) -> None:
+            """Run loop timer callback polling the fn key state."""
+            self._set_state(bool(self.is_fn_pressed()))
+
+        def _event_tap_thread(self) -> None:
+            """Thread that runs a CFRunLoop delivering fn key transitions."""
+            self._run_loop = CFRunLoopGetCurrent()
+            self._tap = CGEventTapCreate(
+                kCGSessionEventTap,
+                kCGHeadInsertEventTap,
+                kCGEventTapOptionListenOnly,
+                CGEventMaskBit(kCGEventFlagsChanged),
+                self._on_event,
+                None,
+            )
+            if self._tap is None:
+                log.warning(
+                    "Cannot create fn key event tap, falling back to polling. "
+                    "Grant input monitoring permission to the terminal to fix this."
+                )
+                # The timer fires on a fixed schedule set by the OS, so it doesn't drift
+                timer = CFRunLoopTimerCreate(
+                    None,
+                    CFAbsoluteTimeGetCurrent(),
+                    self._poll_interval,
+                    0,
+                    0,
+                    self._on_poll_timer,
+                    None,
+                )
+                CFRunLoopAddTimer(self._run_loop, timer, kCFRunLoopCommonModes)
+            else:
+                source = CFMachPortCreateRunLoopSource(None, self._tap, 0)
+                CFRunLoopAddSource(self._run_loop, source, kCFRunLoopCommonModes)
+                CGEventTapEnable(self._tap, True)
+            if self._running:
+                CFRunLoopRun()
 
     # Create a singleton instance
     fn_key_handler = MacFnKeyHandler()
@@ -151,7 +209,7 @@ class AsyncFnKeyHandler:
     
     async def start(self) -> None:
         """Start monitoring fn key events."""
-        self._loop = asyncio.get_event_loop()
+        self._loop = asyncio.get_running_loop()
         fn_key_handler.start(self._on_fn_key_change, self._loop)
     
     async def stop(self) -> None:
@@ -1,42 +1,182 @@
 """
 Module for controlling the volume of specific applications on macOS.
 """
-import subprocess
+import sys
 import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
 import structlog
 
+if sys.platform == 'darwin':
+    from AppKit import NSRunningApplication
+    from ScriptingBridge import SBApplication
+
 log = structlog.get_logger(__name__)
 
+MUSIC_BUNDLE_ID = "com.apple.Music"
+# Music's player state value for playing, the 'kPSP' four-char code
+PLAYER_STATE_PLAYING = 0x6B505350
+
+# Seconds to reuse a read of the Music state
+_STATE_TTL = 0.5
+
+# Apple events are sent in-process through ScriptingBridge, from one dedicated
+# thread that owns the Music app object, so the event loop never waits on Music.
+# Having a single thread also queues the events, Music gets them one at a time.
+_apple_events = ThreadPoolExecutor(max_workers=1, thread_name_prefix="apple-events")
+_music = None
+
+# Last successful read of the Music state: (expiry on the monotonic clock, state).
+# Only touched from the event loop, so no locking is needed.
+_state_cache: tuple[float, tuple[bool, bool, int | None]] | None = None
+# Read of the Music state in progress, joined by concurrent callers
+_state_read: asyncio.Task | None = None
+# Volume Music is known to have, from our last write or read, as (expiry on the
+# monotonic clock, volume). Repeated writes of the same value are skipped while
+# it is fresh, after that the volume may have been changed in Music itself.
+_last_set_volume: tuple[float, int] | None = None
+
 
-async def _run_osascript(script):
+def is_music_app_running():
     """
-    Run an AppleScript command and return the result.
+    Check if the Music app is running.
+    This is a cheap in-process query, so it is a plain function that can be
+    called from any thread.
 
-    Args:
-        script (str): The AppleScript command to run.
+    Returns:
+        bool: True if running, False otherwise.
+    """
+    if sys.platform != 'darwin':
+        return False
+    return bool(NSRunningApplication.runningApplicationsWithBundleIdentifier_(MUSIC_BUNDLE_ID))
+
+
+def _load_music_app():
+    """
+    Create the Music app's scripting object, once.
+    ScriptingBridge builds its classes from Music's scripting definition here,
+    which is the slow part of the first call. It doesn't launch Music.
+    """
+    global _music
+    if _music is None:
+        _music = SBApplication.applicationWithBundleIdentifier_(MUSIC_BUNDLE_ID)
+    return _music
+
+
+def _music_app():
+    """
+    Get the Music app's scripting object, or None if Music is not running.
+    Must be called on the Apple events thread.
+    """
+    # Any command sent to an application that isn't running launches it
+    if not is_music_app_running():
+        return None
+    return _load_music_app()
+
+
+def _read_music_state():
+    music = _music_app()
+    if music is None:
+        return False, False, None
+    return True, music.playerState() == PLAYER_STATE_PLAYING, music.soundVolume()
+
+
+def _write_music_volume(volume):
+    """Returns whether the volume was written, False if Music is not running."""
+    music = _music_app()
+    if music is None:
+        return False
+    music.setSoundVolume_(volume)
+    return True
+
+
+def _mute_if_playing():
+    music = _music_app()
+    if music is None or music.playerState() != PLAYER_STATE_PLAYING:
+        return False, None
+    original_volume = music.soundVolume()
+    music.setSoundVolume_(0)
+    return True, original_volume
+
+
+def preload():
+    """Prepare the Music app object in the background, so the first dictation doesn't wait for it."""
+    if sys.platform != 'darwin':
+        return
+    _apple_events.submit(_load_music_app)
+
+
+async def _send_apple_events(func, *args):
+    """
+    Run a function talking to the Music app on the Apple events thread.
 
     Returns:
-        str: The output of the command, or None if an error occurred.
+        The function's result, or None if an error occurred.
     """
     try:
-        cmd = ['osascript', '-e', script]
-        result = await asyncio.create_subprocess_exec(
-            *cmd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE
-        )
-        stdout, stderr = await result.communicate()
-
-        if result.returncode == 0:
-            return stdout.decode().strip().lower()
-        else:
-            log.warning("AppleScript command failed", script=script, error=stderr.decode().strip())
-            return None
+        return await asyncio.get_running_loop().run_in_executor(_apple_events, func, *args)
     except Exception as e:
-        log.warning("Error running AppleScript", script=script, error=str(e))
+        log.warning("Apple event to Music app failed", action=func.__name__, error=str(e))
         return None
 
 
+def _remember_volume(volume):
+    global _last_set_volume
+    _last_set_volume = None if volume is None else (time.monotonic() + _STATE_TTL, volume)
+
+
+async def _read_state():
+    global _state_cache
+    state = await _send_apple_events(_read_music_state)
+    if state is None:
+        return False, False, None
+    # Don't cache a read that a volume change has invalidated meanwhile
+    if _state_read is asyncio.current_task():
+        _state_cache = (time.monotonic() + _STATE_TTL, state)
+        # The volume may have been changed in Music itself
+        _remember_volume(state[2])
+    return state
+
+
+def _invalidate_volume_cache():
+    """Forget the cached Music state after changing the volume."""
+    global _state_cache, _state_read
+    _state_cache = None
+    # A read already in flight may predate the change, don't let new callers join it
+    _state_read = None
+
+
+async def snapshot_music_state():
+    """
+    Get whether the Music app is running and playing, and its volume, in one go.
+    Results are reused for a short while, and concurrent calls share a single read.
+
+    Returns:
+        tuple[bool, bool, int | None]: Running, playing, and the volume (0-100)
+        or None if Music app is not running.
+    """
+    global _state_read
+    if _state_cache is not None and _state_cache[0] > time.monotonic():
+        return _state_cache[1]
+    # Most of the time Music isn't running, and that needs no Apple events
+    if not is_music_app_running():
+        _remember_volume(None)
+        return False, False, None
+
+    task = _state_read
+    if task is None:
+        task = _state_read = asyncio.create_task(_read_state())
+
+        def forget(done):
+            global _state_read
+            if _state_read is done:
+                _state_read = None
+
+        task.add_done_callback(forget)
+    # Shielded, so a cancelled caller doesn't cancel the read for the others
+    return await asyncio.shield(task)
+
+
 async def get_music_app_volume():
     """
     Get the current volume of the Music app.
@@ -44,37 +184,63 @@ async def get_music_app_volume():
     Returns:
         int: The current volume (0-100) or None if Music app is not running.
     """
-    result = await _run_osascript('tell application "Music" to get sound volume')
-    if result is not None:
-        try:
-            return int(result)
-        except ValueError:
-            log.warning("Failed to parse Music app volume", result=result)
-    return None
+    _, _, volume = await snapshot_music_state()
+    return volume
 
 
 async def set_music_app_volume(volume):
     """
-    Set the volume of the Music app.
+    Set the volume of the Music app, if it is running.
+    Does nothing if the volume is already known to be at that level.
 
     Args:
         volume (int): Volume level (0-100).
 
     Returns:
-        bool: True if successful, False otherwise.
+        bool: True if the volume was set, False if Music isn't running or
+        setting it failed.
     """
     # Ensure volume is within valid range
     volume = max(0, min(100, int(volume)))
+    known = _last_set_volume
+    if known is not None and known[0] > time.monotonic() and known[1] == volume:
+        return True
 
-    result = await _run_osascript(f'tell application "Music" to set sound volume to {volume}')
-    if result is not None:
-        log.debug(f"Set Music app volume to {volume}")
+    result = await _send_apple_events(_write_music_volume, volume)
+    _invalidate_volume_cache()
+    _remember_volume(volume if result else None)
+    if result:
+        log.debug("Set Music app volume to %s", volume)
         return True
+    elif result is False:
+        log.debug("Music app is not running, volume not set")
+        return False
     else:
-        log.warning(f"Failed to set Music app volume to {volume}")
+        log.warning("Failed to set Music app volume to %s", volume)
         return False
 
 
+async def check_and_mute():
+    """
+    Mute the Music app if it is playing, in a single hop to the Apple events thread.
+
+    Returns:
+        tuple[bool, int | None]: Whether music was playing and the volume it had
+        before muting, or (False, None) if it wasn't playing.
+    """
+    if not is_music_app_running():
+        _remember_volume(None)
+        return False, None
+    result = await _send_apple_events(_mute_if_playing)
+    _invalidate_volume_cache()
+    if result is None:
+        _remember_volume(None)
+        return False, None
+    if result[0]:
+        _remember_volume(0)
+    return result
+
+
 async def mute_music_app():
     """
     Mute the Music app by setting volume to 0.
@@ -100,17 +266,6 @@ async def restore_music_app_volume(original_volume):
     return False
 
 
-async def is_music_app_running():
-    """
-    Check if the Music app is running.
-
-    Returns:
-        bool: True if running, False otherwise.
-    """
-    result = await _run_osascript('tell application "System Events" to (name of processes) contains "Music"')
-    return result == "true"
-
-
 async def is_music_playing():
     """
     Check if music is currently playing in the Music app.
@@ -118,10 +273,5 @@ async def is_music_playing():
     Returns:
         bool: True if music is playing, False otherwise.
     """
-    # First check if Music app is running
-    if not await is_music_app_running():
-        return False
-
-    # If Music app is running, check if it's playing
-    result = await _run_osascript('tell application "Music" to player state is playing')
-    return result == "true"
+    _, playing, _ = await snapshot_music_state()
+    return playing
@@ -2,15 +2,31 @@ import pytest
 import wave
 import asyncio
 import io
+import numpy as np
 from unittest.mock import MagicMock, patch
+from smart_dictation import audio
+from smart_dictation.hotkeys import StopTask
+from smart_dictation.legacy import to_wave
 from smart_dictation.audio import (
-    to_wave,
+    to_whisper_ndarray,
     infer_time,
     record_audio,
     get_sound_devices,
 )
 
 
+@pytest.fixture(autouse=True)
+def fresh_pyaudio():
+    """Drop the shared PortAudio host and device caches between tests."""
+    audio._pa = None
+    audio._session = None
+    get_sound_devices.cache_clear()
+    audio.get_device_info.cache_clear()
+    yield
+    audio._pa = None
+    audio._session = None
+
+
 def test_to_wave():
     samples = b"\x00\x01\x02\x03"
     sample_rate = 16000
@@ -27,6 +43,23 @@ def test_to_wave():
         assert wf.getframerate() == sample_rate
 
 
+def test_to_whisper_ndarray():
+    samples = np.array([0, 32767, -32767, 16384], dtype=np.int16).tobytes()
+    result = to_whisper_ndarray(samples, sample_rate=16000, channels=1, sample_width=2)
+    assert result.dtype == np.float32
+    np.testing.assert_allclose(result, [0.0, 1.0, -1.0, 16384 / 32767], rtol=1e-6)
+
+
+def test_to_whisper_ndarray_into_buffer():
+    samples = np.array([0, 32767], dtype=np.int16).tobytes()
+    buffer = np.full(4, np.nan, dtype=np.float32)
+    result = to_whisper_ndarray(
+        samples, sample_rate=16000, channels=1, sample_width=2, out=buffer[:2]
+    )
+    assert np.shares_memory(result, buffer)
+    np.testing.assert_allclose(buffer[:2], [0.0, 1.0])
+
+
 def test_infer_time():
     samples = b"\x00\x01\x02\x03" * 2000  # 8000 bytes
     expected_time = 0.25  # 8000 / 16000 / 2
@@ -36,15 +69,79 @@ def test_infer_time():
 @pytest.mark.asyncio
 async def test_record_audio():
     stop_event = asyncio.Event()
+    # Just over a second of 16 kHz int16 audio, shorter recordings are dropped
+    chunk = b"\x00\x01\x02\x03" * 8001
+
+    def open_stream(**kwargs):
+        # Emulate PortAudio delivering one chunk once the stream is started
+        callback = kwargs["stream_callback"]
+        stream = MagicMock()
+        stream.start_stream.side_effect = lambda: callback(chunk, 16000, {}, 0)
+        return stream
 
     with patch("pyaudio.PyAudio") as mock_pyaudio:
-        mock_stream = MagicMock()
-        mock_pyaudio.return_value.open.return_value = mock_stream
-        mock_stream.read.return_value = b"\x00\x01\x02\x03" * 8000
-        asyncio.get_event_loop().call_later(0.1, stop_event.set)
-        convert = lambda x, **kw: "converted"
+        mock_pyaudio.return_value.open.side_effect = open_stream
+        mock_pyaudio.return_value.get_sample_size.return_value = 2
+        asyncio.get_running_loop().call_later(0.1, stop_event.set)
+        convert = lambda x, **kw: bytes(x)
         result = await record_audio(stop_event, convert=convert)
-        assert result == "converted"
+        assert result == chunk
+
+        # The stream stays open and is reused by the next recording
+        stop_event.clear()
+        asyncio.get_running_loop().call_later(0.1, stop_event.set)
+        result = await record_audio(stop_event, convert=convert)
+        assert result == chunk
+        mock_pyaudio.return_value.open.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_record_audio_too_short():
+    stop_event = asyncio.Event()
+    stop_event.set()
+
+    with patch("pyaudio.PyAudio") as mock_pyaudio:
+        mock_pyaudio.return_value.get_sample_size.return_value = 2
+        with pytest.raises(StopTask):
+            await record_audio(stop_event, convert=lambda x, **kw: "converted")
+
+
+@pytest.mark.asyncio
+async def test_record_audio_reopens_lost_device():
+    stop_event = asyncio.Event()
+    chunk = b"\x00\x01\x02\x03" * 8001
+    streams = []
+
+    def open_stream(**kwargs):
+        callback = kwargs["stream_callback"]
+        stream = MagicMock()
+        if not streams:
+            # The first stream belongs to a device that went away
+            stream.start_stream.side_effect = OSError("Device unavailable")
+        else:
+            stream.start_stream.side_effect = lambda: callback(chunk, 16000, {}, 0)
+        streams.append(stream)
+        return stream
+
+    with patch("pyaudio.PyAudio") as mock_pyaudio:
+        mock_pyaudio.return_value.open.side_effect = open_stream
+        mock_pyaudio.return_value.get_sample_size.return_value = 2
+        asyncio.get_running_loop().call_later(0.1, stop_event.set)
+        result = await record_audio(stop_event, convert=lambda x, **kw: bytes(x))
+        assert result == chunk
+        assert len(streams) == 2
+        streams[0].close.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_record_audio_device_unavailable():
+    stop_event = asyncio.Event()
+
+    with patch("pyaudio.PyAudio") as mock_pyaudio:
+        mock_pyaudio.return_value.open.side_effect = OSError("Device unavailable")
+        with pytest.raises(StopTask, match="Input device unavailable"):
+            await record_audio(stop_event)
+        assert mock_pyaudio.return_value.open.call_count == 2
 
 
 def test_get_sound_devices():
@@ -59,3 +156,5 @@ def test_get_sound_devices():
         devices = get_sound_devices()
         assert len(devices) == 1
         assert devices[0][1] == "Mock Device"
+        assert get_sound_devices() is devices
+        mock_pyaudio.assert_called_once()
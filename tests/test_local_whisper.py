@@ -0,0 +1,137 @@
+import pytest
+import sys
+import threading
+import multiprocessing
+import numpy as np
+from unittest.mock import MagicMock, patch
+from smart_dictation.hotkeys import StopTask
+
+# The config parses the command line on import, keep pytest's arguments away from it
+with patch.object(sys, "argv", sys.argv[:1]):
+    from smart_dictation import local_whisper
+
+
+@pytest.fixture
+def available_models(monkeypatch):
+    monkeypatch.setattr(
+        local_whisper.pywhispercpp.constants,
+        "AVAILABLE_MODELS",
+        ["base.en", "large-v3-turbo", "large-v3-turbo-q5_0", "large-v3-turbo-q8_0"],
+    )
+
+
+@pytest.mark.parametrize(
+    "model, quantization, expected",
+    [
+        ("large-v3-turbo", "q8_0", "large-v3-turbo-q8_0"),
+        ("large-v3-turbo", "f16", "large-v3-turbo"),
+        # Already quantized
+        ("large-v3-turbo-q5_0", "q8_0", "large-v3-turbo-q5_0"),
+        # No q8_0 variant published, falls back to the base model
+        ("base.en", "q8_0", "base.en"),
+    ],
+)
+def test_quantized_model_name(available_models, model, quantization, expected):
+    assert local_whisper.quantized_model_name(model, quantization) == expected
+
+
+class StubSegment:
+    def __init__(self, text):
+        self.text = text
+
+
+class StubModel:
+    """Reports what it was asked to transcribe instead of running whisper.cpp."""
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def transcribe(self, data, **kwargs):
+        if data.size == 7:
+            raise ValueError("boom")
+        return [StubSegment(f"{data.size}:{data[0]:.3f}")]
+
+
+@pytest.fixture
+def transcriber(monkeypatch):
+    """A transcriber talking to the worker loop running in a thread instead of a process."""
+    monkeypatch.setattr(local_whisper.pywhispercpp.model, "Model", StubModel)
+    conn, child_conn = multiprocessing.Pipe()
+    worker = threading.Thread(
+        target=local_whisper._worker_main, args=(child_conn, "stub", "", 1, False)
+    )
+    worker.start()
+    assert conn.recv() == "ready"
+
+    transcriber = local_whisper.WhisperCppTranscriber()
+    transcriber._conn = conn
+    transcriber._process = MagicMock()
+    transcriber._process.is_alive.return_value = True
+    yield transcriber
+    conn.close()
+    worker.join()
+    transcriber._release_buffer()
+
+
+def record(transcriber, n_samples):
+    frames = np.full(n_samples, 16384, dtype=np.int16).tobytes()
+    return transcriber.to_whisper_ndarray(frames, sample_rate=16000, channels=1, sample_width=2)
+
+
+@pytest.mark.asyncio
+async def test_transcribe_grows_shared_buffer(transcriber):
+    wave = record(transcriber, 100)
+    assert np.shares_memory(wave, transcriber._f32_buf)
+    assert await transcriber(wave) == "100:0.500"
+    first_segment = transcriber._shm.name
+
+    # A smaller recording reuses the segment
+    wave = record(transcriber, 50)
+    assert await transcriber(wave) == "50:0.500"
+    assert transcriber._shm.name == first_segment
+
+    # A larger one moves to a new segment, the worker follows it
+    wave = record(transcriber, 200)
+    assert transcriber._shm.name != first_segment
+    assert await transcriber(wave) == "200:0.500"
+
+
+@pytest.mark.asyncio
+async def test_retired_segment_closed_once_released(transcriber):
+    held = record(transcriber, 100)
+    # The previous recording is still referenced, so its segment can't be closed yet
+    wave = record(transcriber, 200)
+    assert len(transcriber._retired) == 1
+    assert await transcriber(wave) == "200:0.500"
+    assert held[0] == np.float32(16384 / 32767)
+
+    del held, wave
+    record(transcriber, 400)
+    assert transcriber._retired == []
+
+
+@pytest.mark.asyncio
+async def test_transcribe_copies_foreign_array(transcriber):
+    audio_data = np.full(10, 0.5, dtype=np.float32)
+    assert await transcriber(audio_data) == "10:0.500"
+    assert not np.shares_memory(audio_data, transcriber._f32_buf)
+    np.testing.assert_array_equal(transcriber._f32_buf[:10], audio_data)
+
+
+@pytest.mark.asyncio
+async def test_transcription_error_stops_task_only(transcriber):
+    with pytest.raises(StopTask, match="boom"):
+        await transcriber(record(transcriber, 7))
+    # The worker keeps serving
+    assert await transcriber(record(transcriber, 10)) == "10:0.500"
+
+
+@pytest.mark.asyncio
+async def test_worker_death_stops_task_and_resets(transcriber):
+    process = transcriber._process
+    # Closing the pipe also ends the worker loop
+    transcriber._conn.close()
+    with pytest.raises(StopTask, match="died"):
+        await transcriber(record(transcriber, 10))
+    process.kill.assert_called_once()
+    assert transcriber._process is None
@@ -0,0 +1,136 @@
+import pytest
+import asyncio
+from unittest.mock import MagicMock
+from smart_dictation import volume_control
+from smart_dictation.volume_control import (
+    check_and_mute,
+    set_music_app_volume,
+    snapshot_music_state,
+)
+
+
+@pytest.fixture(autouse=True)
+def music(monkeypatch):
+    """Pretend Music is running and record the Apple events sent to it."""
+    calls = []
+    state = {"read": (True, True, 50), "gate": None}
+
+    async def send_apple_events(func, *args):
+        calls.append((func.__name__, *args))
+        if func is volume_control._read_music_state:
+            if state["gate"] is not None:
+                await state["gate"].wait()
+            return state["read"]
+        if func is volume_control._mute_if_playing:
+            return True, state["read"][2]
+        return True
+
+    monkeypatch.setattr(volume_control, "is_music_app_running", lambda: True)
+    monkeypatch.setattr(volume_control, "_send_apple_events", send_apple_events)
+    monkeypatch.setattr(volume_control, "_state_cache", None)
+    monkeypatch.setattr(volume_control, "_state_read", None)
+    monkeypatch.setattr(volume_control, "_last_set_volume", None)
+    return calls, state
+
+
+@pytest.mark.asyncio
+async def test_repeated_volume_write_is_skipped(music):
+    calls, _ = music
+    assert await set_music_app_volume(30)
+    assert await set_music_app_volume(30)
+    assert calls == [("_write_music_volume", 30)]
+
+
+@pytest.mark.asyncio
+async def test_expired_volume_is_written_again(music, monkeypatch):
+    calls, _ = music
+    assert await set_music_app_volume(30)
+    # Long enough later the volume may have been changed in Music itself
+    now = volume_control.time.monotonic() + volume_control._STATE_TTL + 1
+    monkeypatch.setattr(volume_control.time, "monotonic", lambda: now)
+    assert await set_music_app_volume(30)
+    assert calls == [("_write_music_volume", 30)] * 2
+
+
+@pytest.mark.asyncio
+async def test_volume_not_set_when_music_quit(music, monkeypatch):
+    calls, _ = music
+    real_send = volume_control._send_apple_events
+
+    async def music_quit(func, *args):
+        await real_send(func, *args)
+        return False
+
+    monkeypatch.setattr(volume_control, "_send_apple_events", music_quit)
+    assert not await set_music_app_volume(30)
+    # Nothing was written, so the next attempt goes through
+    assert not await set_music_app_volume(30)
+    assert calls == [("_write_music_volume", 30)] * 2
+
+
+@pytest.mark.asyncio
+async def test_mute_skips_writing_zero_again(music):
+    calls, _ = music
+    assert await check_and_mute() == (True, 50)
+    assert await volume_control.mute_music_app()
+    assert calls == [("_mute_if_playing",)]
+
+
+@pytest.mark.asyncio
+async def test_read_volume_allows_writing_it_back(music):
+    calls, state = music
+    assert await set_music_app_volume(30)
+    # The cached read expires, and Music reports the volume was changed in Music itself
+    volume_control._invalidate_volume_cache()
+    state["read"] = (True, True, 70)
+    assert await snapshot_music_state() == (True, True, 70)
+    assert await set_music_app_volume(30)
+    assert calls.count(("_write_music_volume", 30)) == 2
+
+
+@pytest.mark.asyncio
+async def test_snapshot_is_cached_until_a_write(music):
+    calls, state = music
+    assert await snapshot_music_state() == (True, True, 50)
+    assert await snapshot_music_state() == (True, True, 50)
+    assert calls == [("_read_music_state",)]
+
+    state["read"] = (True, True, 20)
+    await set_music_app_volume(20)
+    assert await snapshot_music_state() == (True, True, 20)
+    assert calls.count(("_read_music_state",)) == 2
+
+
+@pytest.mark.asyncio
+async def test_concurrent_snapshots_share_one_read(music):
+    calls, state = music
+    state["gate"] = asyncio.Event()
+    reads = asyncio.gather(snapshot_music_state(), snapshot_music_state())
+    await asyncio.sleep(0)
+    state["gate"].set()
+    assert await reads == [(True, True, 50), (True, True, 50)]
+    assert calls == [("_read_music_state",)]
+
+
+@pytest.mark.asyncio
+async def test_read_started_before_a_write_is_not_cached(music):
+    calls, state = music
+    state["gate"] = asyncio.Event()
+    stale_read = asyncio.create_task(snapshot_music_state())
+    await asyncio.sleep(0)
+    await set_music_app_volume(10)
+    state["gate"].set()
+    assert await stale_read == (True, True, 50)
+
+    state["gate"] = None
+    state["read"] = (True, True, 10)
+    assert await snapshot_music_state() == (True, True, 10)
+    assert calls.count(("_read_music_state",)) == 2
+
+
+def test_preload_is_a_no_op_off_macos(monkeypatch):
+    monkeypatch.setattr(volume_control.sys, "platform", "linux")
+    apple_events = MagicMock()
+    monkeypatch.setattr(volume_control, "_apple_events", apple_events)
+    volume_control.preload()
+    apple_events.submit.assert_not_called()